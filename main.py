@@ -3,32 +3,278 @@ import argparse
 import datetime
 import logging
 import subprocess  # ffmpegを呼び出すために使用
-from faster_whisper import WhisperModel
+import itertools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+# faster_whisper・ctranslate2・numpyは読み込みに時間がかかるため、`--help`などを素早く返せるよう
+# 実際に使うメソッドの中でimportする
+
+# 読み込み済みのWhisperモデル。(モデル名, デバイス, 演算精度, 保存先) をキーに再利用する
+_MODEL_CACHE = {}
 
 class MeeTrans:
-    def __init__(self, input_file, output_file, model, timestamp, prompt_file=None):
+    # ffprobeが使えない場合に動画ファイルとみなす拡張子
+    VIDEO_EXTENSIONS = ['.mp4', '.mkv', '.mov', '.avi']
+    PROGRESS_INTERVAL = 20  # 何セグメントごとに進捗をログに出力するか
+    WRITE_BUFFER_SIZE = 1 << 20  # 出力ファイルの書き込みバッファ（1MiB）
+    WINDOW_EDGE_SECONDS = 1  # 区間の末尾からこの秒数以内まで続く発話は、次の区間に繰り越す
+    PROMPT_TAIL_CHARS = 224  # 次の区間のプロンプトに引き継ぐ直前の文字起こし結果の文字数（Whisperのプロンプト上限224トークン相当）
+    # 演算精度ごとのデフォルトのバッチサイズ（重みの小さいint8_float16ほどVRAMに余裕がある）
+    DEFAULT_BATCH_SIZES = {"float16": 8, "int8_float16": 16, "int8": 4}
+    # モデル名とHugging Face Hub上のリポジトリの対応（faster-whisperのモデル名の別名に合わせる）
+    MODEL_REPOS = {"tiny": "Systran/faster-whisper-tiny", "base": "Systran/faster-whisper-base",
+                   "small": "Systran/faster-whisper-small", "medium": "Systran/faster-whisper-medium",
+                   "large-v3": "Systran/faster-whisper-large-v3",
+                   "large-v3-turbo": "mobiuslabsgmbh/faster-whisper-large-v3-turbo"}
+    # モデルごとのパラメータ数（百万）。必要なVRAMの見積もりに使う
+    MODEL_PARAMS = {"tiny": 39, "base": 74, "small": 244, "medium": 769, "large-v3": 1550,
+                    "large-v3-turbo": 809}
+    # 演算精度ごとの重み1つあたりのバイト数
+    COMPUTE_TYPE_BYTES = {"float16": 2, "int8_float16": 1, "int8": 1}
+    # 演算精度を下げていく順番。int8はint8_float16と重みのサイズが同じため、
+    # VRAM不足ではなくGPUがint8_float16に対応していない場合にのみ選ばれる
+    CUDA_FALLBACK_ORDER = ["float16", "int8_float16", "int8"]
+    VRAM_MARGIN = 1.3  # 重みのサイズに対して必要とみなす空きVRAMの倍率
+
+    def __init__(self, input_file, output_file, model, timestamp, prompt_file=None, device="auto", compute_type=None,
+                 condition_on_previous_text=False, batch_size=None, fast=False):
         """MeeTransクラスの初期化メソッド。
 
         Args:
             input_file (str): 入力する音声または動画ファイルのパス。
             output_file (str): 出力先のテキストファイルのパス。
-            model (str): 使用するAIモデル名。例: 'tiny', 'base', 'small', 'medium', 'large-v3'。デフォルトは'large-v3'。
+            model (str): 使用するAIモデル名。例: 'tiny', 'base', 'small', 'medium', 'large-v3', 'large-v3-turbo'。デフォルトは'large-v3'。
             timestamp (bool): 出力にタイムスタンプを含めるかどうかのフラグ。
             prompt_file (str, optional): 用語集や参考文を記載したテキストファイルのパス。デフォルトはNone。
+            device (str, optional): 推論に使用するデバイス。'auto', 'cuda', 'cpu'のいずれか。
+                'auto'の場合はCUDAデバイスがあれば'cuda'、なければ'cpu'を選択します。デフォルトは'auto'。
+            compute_type (str, optional): モデルの演算精度。'float16', 'int8_float16', 'int8'のいずれか。
+                Noneの場合は'cuda'では'int8_float16'、'cpu'では'int8'を使用します。デフォルトはNone。
+            condition_on_previous_text (bool, optional): 直前の文字起こし結果を次の区間のプロンプトに使うかどうか。
+                Trueの場合はバッチ推論を使わず、区間を順にデコードします。
+                長い音声で同じ文の繰り返しを防ぐため、デフォルトはFalse。
+            batch_size (int, optional): 一度にまとめて推論する音声区間の数。
+                Noneの場合は演算精度に応じて`DEFAULT_BATCH_SIZES`から選択します。
+                VRAMの都合で演算精度を下げた場合は半分にします。デフォルトはNone。
+            fast (bool, optional): ビームサーチを行わない貪欲法でデコードするかどうか。
+                精度がわずかに下がる代わりにデコードが数倍速くなります。デフォルトはFalse。
+
+        Raises:
+            FileNotFoundError: 入力ファイルが見つからない場合。
+            ValueError: batch_sizeが1未満の場合。
         """
         self.input_file = input_file
         self.output_file = output_file
         self.model = model
         self.timestamp = timestamp
         self.prompt_file = prompt_file
-        self.audio_file = None  # 動画ファイルを音声ファイルに変換する場合に一時的に使う
+        self.condition_on_previous_text = condition_on_previous_text
         self.setup_logging()
+        # 入力ファイルの指定ミスはモデルを読み込む前に知らせる
+        if not os.path.isfile(input_file):
+            raise FileNotFoundError(f"入力ファイル '{input_file}' が見つかりません。")
+        self.device, self.compute_type = self.select_device(device, compute_type)
+        requested_compute_type = self.compute_type
+        if self.device == "cuda":
+            self.device, self.compute_type = self.fit_to_vram(model, requested_compute_type)
+        self.fast = fast
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_sizeには1以上の整数を指定してください（指定値: {batch_size}）。")
+        if self.device == "cuda" and self.compute_type != requested_compute_type:
+            # 演算精度を下げたGPUはVRAMに余裕がないため、バッチの推論に使うメモリも抑えるよう
+            # 指定された演算精度でのバッチサイズを半分にする
+            base = self.DEFAULT_BATCH_SIZES.get(requested_compute_type, 8) if batch_size is None else batch_size
+            self.batch_size = max(1, base // 2)
+            self.logger.warning(f"[MeeTrans.__init__] 演算精度を下げたため、バッチサイズを {base} から {self.batch_size} に変更します。")
+        else:
+            self.batch_size = self.DEFAULT_BATCH_SIZES.get(self.compute_type, 8) if batch_size is None else batch_size
+        self.audio_file = None  # 文字起こし対象の音声（ファイルパス、または`_open_audio_stream()`の戻り値）
+
+        # 動画からの音声読み込みとSilero VADの初期化をバックグラウンドで開始し、モデルの読み込みと並行して行う
+        executor = ThreadPoolExecutor(max_workers=1)
+        self._convert_future = executor.submit(self._maybe_convert)
+
+        from faster_whisper import BatchedInferencePipeline, WhisperModel
+        from faster_whisper.vad import get_vad_model
+        # get_vad_modelはONNX Runtimeのセッションをキャッシュするため、ここで一度作成しておけば
+        # 以降のtranscribe()（transcribe_many()で処理する別ファイルを含む）で再利用される
+        self._vad_future = executor.submit(get_vad_model)
+        executor.shutdown(wait=False)
+        self.logger.info(f"[MeeTrans.__init__] デバイス '{self.device}'、演算精度 '{self.compute_type}' でモデルを読み込みます。")
 
         # Whisperモデルのインスタンスを作成
-        cwd = os.path.dirname(__file__).replace('\\', '/')
-        model_path = f'{cwd}/models'
+        # モデルはプロジェクト間で共有できるよう、環境変数MEETRANS_MODEL_DIRまたは~/.cache/meetrans/modelsに保存する
+        model_path = os.environ.get("MEETRANS_MODEL_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "meetrans", "models")
         os.makedirs(model_path, exist_ok=True)
-        self.whisper_model = WhisperModel(model, device="cuda", compute_type="float16", download_root=model_path)
+        key = (model, self.device, self.compute_type, model_path)
+        if key not in _MODEL_CACHE:
+            cpu_threads = (os.cpu_count() or 0) if self.device == "cpu" else 0
+            _MODEL_CACHE[key] = WhisperModel(model, device=self.device, compute_type=self.compute_type,
+                                             cpu_threads=cpu_threads, num_workers=1, download_root=model_path,
+                                             local_files_only=self.is_model_downloaded(model, model_path))
+        self.whisper_model = _MODEL_CACHE[key]
+        # VADで切り出した区間をまとめてエンコーダ/デコーダに流すパイプライン
+        # （区間を並列に処理するため、直前の文字起こし結果をプロンプトに使うことはできない）
+        self.pipeline = BatchedInferencePipeline(model=self.whisper_model)
+
+    @classmethod
+    def transcribe_many(cls, files, model, timestamp, prompt_file=None, **kwargs):
+        """複数の音声/動画ファイルを同じモデルで続けて文字起こしするクラスメソッド。
+
+        モデルは最初のファイルで一度だけ読み込まれ、以降のファイルでは再利用されます。
+        各ファイルの結果は入力ファイルと同じ場所に拡張子'.txt'で保存されます。
+
+        Args:
+            files (list): 入力する音声または動画ファイルのパスのリスト。
+            model (str): 使用するAIモデル名。
+            timestamp (bool): 出力にタイムスタンプを含めるかどうかのフラグ。
+            prompt_file (str, optional): 用語集や参考文を記載したテキストファイルのパス。デフォルトはNone。
+            **kwargs: `__init__`に渡すその他のキーワード引数（device, compute_typeなど）。
+
+        Raises:
+            ValueError: 複数の入力ファイルの出力先が同じパスになる場合。
+        """
+        output_files = cls.batch_output_files(files)
+        for input_file, output_file in zip(files, output_files):
+            cls(input_file, output_file, model, timestamp, prompt_file, **kwargs).transcribe()
+
+    @staticmethod
+    def batch_output_files(files):
+        """複数の入力ファイルに対応する出力先のパスを求める静的メソッド。
+
+        出力先は入力ファイルと同じ場所で拡張子を'.txt'にしたパスです。'a.mp4'と'a.wav'のように
+        拡張子以外が同じ入力があると結果が上書きされるため、その場合はエラーにします。
+
+        Args:
+            files (list): 入力する音声または動画ファイルのパスのリスト。
+
+        Returns:
+            list: 各入力ファイルに対応する出力先のパスのリスト。
+
+        Raises:
+            ValueError: 複数の入力ファイルの出力先が同じパスになる場合。
+        """
+        output_files = [f"{os.path.splitext(input_file)[0]}.txt" for input_file in files]
+        seen = {}
+        for input_file, output_file in zip(files, output_files):
+            key = os.path.normcase(os.path.abspath(output_file))
+            if key in seen:
+                raise ValueError(f"入力ファイル '{seen[key]}' と '{input_file}' の出力先がどちらも '{output_file}' になります。")
+            seen[key] = input_file
+        return output_files
+
+    @staticmethod
+    def is_model_downloaded(model, model_path):
+        """モデルがダウンロード済みかどうかを確認する静的メソッド。
+
+        ダウンロード済みの場合はHugging Face Hubへの問い合わせを省略し、
+        ローカルのモデルファイルをそのまま読み込めるようにします。
+        `faster_whisper.download_model`は未ダウンロード時に同期失敗の警告を出力するため、
+        キャッシュの確認には`huggingface_hub.snapshot_download`を直接使います。
+
+        Args:
+            model (str): 使用するAIモデル名。
+            model_path (str): モデルの保存先ディレクトリのパス。
+
+        Returns:
+            bool: ダウンロード済みであればTrue。
+        """
+        from huggingface_hub import snapshot_download
+        from huggingface_hub.utils import LocalEntryNotFoundError
+        repo_id = MeeTrans.MODEL_REPOS.get(model, model)
+        try:
+            local_dir = snapshot_download(repo_id, local_files_only=True, cache_dir=model_path)
+        except LocalEntryNotFoundError:
+            return False
+        return os.path.isfile(os.path.join(local_dir, "model.bin"))
+
+    @staticmethod
+    def get_free_vram():
+        """CTranslate2が使用するGPU（CUDAのデバイス番号0）の空きVRAMを取得する静的メソッド。
+
+        NVMLは`CUDA_VISIBLE_DEVICES`を考慮しないため、その先頭のデバイスをUUIDまたは番号で
+        NVMLのデバイスに対応付けます。番号での対応付けは、GPUが1つだけの場合か
+        `CUDA_DEVICE_ORDER=PCI_BUS_ID`の場合（CUDAとNVMLの並び順が一致する場合）に限ります。
+        pynvmlがインストールされていない場合や、対応付けや取得に失敗した場合はNoneを返します。
+
+        Returns:
+            int | None: 空きVRAMのバイト数。
+        """
+        try:
+            import pynvml
+        except ImportError:
+            return None
+        visible = os.environ.get("CUDA_VISIBLE_DEVICES")
+        device = visible.split(",")[0].strip() if visible is not None else "0"
+        try:
+            pynvml.nvmlInit()
+            try:
+                if device.startswith(("GPU-", "MIG-")):
+                    handle = pynvml.nvmlDeviceGetHandleByUUID(device)
+                elif device.isdigit() and (os.environ.get("CUDA_DEVICE_ORDER") == "PCI_BUS_ID"
+                                           or pynvml.nvmlDeviceGetCount() == 1):
+                    handle = pynvml.nvmlDeviceGetHandleByIndex(int(device))
+                else:
+                    return None
+                return pynvml.nvmlDeviceGetMemoryInfo(handle).free
+            finally:
+                pynvml.nvmlShutdown()
+        except pynvml.NVMLError:
+            return None
+
+    def fit_to_vram(self, model, compute_type):
+        """GPUで使用できる演算精度と空きVRAMに合わせて演算精度を調整するメソッド。
+
+        GPUが対応していない演算精度や、空きVRAMがモデルの重みの`VRAM_MARGIN`倍に
+        満たない演算精度は`CUDA_FALLBACK_ORDER`の順に下げていきます（`_MODEL_CACHE`に読み込み済みの
+        モデルはそのまま使います）。どの演算精度でも収まらない場合はCPU（int8）で実行します。
+        空きVRAMが取得できない場合は対応状況のみ確認します。見積もりは重みのみで、バッチの推論に
+        使うメモリは演算精度を下げた際に`__init__`でバッチサイズを半分にすることで抑えます。
+
+        Args:
+            model (str): 使用するAIモデル名。
+            compute_type (str): 指定された演算精度。
+
+        Returns:
+            tuple: (デバイス名, 演算精度) のタプル。
+        """
+        import ctranslate2
+        supported = ctranslate2.get_supported_compute_types("cuda")
+        free = self.get_free_vram()
+        start = self.CUDA_FALLBACK_ORDER.index(compute_type) if compute_type in self.CUDA_FALLBACK_ORDER else 0
+        for candidate in self.CUDA_FALLBACK_ORDER[start:]:
+            if candidate not in supported:
+                continue
+            # 読み込み済みのモデルは既にVRAMを使用しているため、空きVRAMの確認は不要
+            if any(key[:3] == (model, "cuda", candidate) for key in _MODEL_CACHE):
+                return "cuda", candidate
+            required = self.MODEL_PARAMS.get(model, 0) * 1e6 * self.COMPUTE_TYPE_BYTES[candidate] * self.VRAM_MARGIN
+            if free is not None and free < required:
+                continue
+            if candidate != compute_type:
+                self.logger.warning(f"[MeeTrans.fit_to_vram] 演算精度 '{compute_type}' はこのGPUでは非対応かVRAMが不足するため、"
+                                    f"'{candidate}' に変更します。")
+            return "cuda", candidate
+        self.logger.warning(f"[MeeTrans.fit_to_vram] GPUのVRAMが不足しているため、CPU（演算精度 'int8'）で実行します。")
+        return "cpu", "int8"
+
+    @staticmethod
+    def select_device(device, compute_type):
+        """使用するデバイスと演算精度を決定する静的メソッド。
+
+        Args:
+            device (str): 'auto', 'cuda', 'cpu'のいずれか。
+            compute_type (str): 演算精度。Noneの場合はデバイスに応じて自動で選択します。
+
+        Returns:
+            tuple: (デバイス名, 演算精度) のタプル。
+        """
+        if device == "auto":
+            import ctranslate2  # torchのimportを避けるため、ctranslate2でCUDAデバイスの有無を確認する
+            device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        if compute_type is None:
+            compute_type = "int8_float16" if device == "cuda" else "int8"
+        return device, compute_type
 
     def setup_logging(self):
         """ロギングの設定を行うメソッド。
@@ -40,39 +286,295 @@ class MeeTrans:
                             format='%(asctime)s - %(levelname)s - %(message)s')
         self.logger = logging.getLogger(__name__)
 
-    def convert_video_to_audio(self):
-        """動画ファイルをmp3に変換するメソッド。
+    @staticmethod
+    def _ffprobe(path, stream, entries):
+        """ffprobeで指定したストリームの情報を取得する静的メソッド。
+
+        Args:
+            path (str): 入力ファイルのパス。
+            stream (str): 対象のストリーム指定子。例: 'v:0', 'a:0'。
+            entries (str): 取得する項目。例: 'stream=codec_type'。
+
+        Returns:
+            str: ffprobeの出力（CSV形式、該当ストリームがなければ空文字列）。
+
+        Raises:
+            FileNotFoundError: ffprobeが見つからない場合。
+            RuntimeError: ffprobeが入力ファイルを読み込めなかった場合（ffprobeのエラーメッセージを含む）。
+        """
+        command = ["ffprobe", "-v", "error", "-select_streams", stream,
+                   "-show_entries", entries, "-of", "csv=p=0", path]
+        try:
+            return subprocess.run(command, capture_output=True, check=True, text=True).stdout.strip()
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"ffprobeで入力ファイル '{path}' を読み込めませんでした: {e.stderr.strip()}") from e
+
+    def _has_video_stream(self, path):
+        """入力ファイルに動画ストリームが含まれるかを確認するメソッド。
+
+        mp3やm4aに埋め込まれたカバー画像（attached_pic）は動画ストリームとみなしません。
+        ffprobeが見つからない場合は、従来どおり拡張子が`VIDEO_EXTENSIONS`に含まれるかで判定します。
+
+        Args:
+            path (str): 入力ファイルのパス。
+
+        Returns:
+            bool: 動画ストリームがあればTrue。
+        """
+        try:
+            output = self._ffprobe(path, "v", "stream=codec_type:stream_disposition=attached_pic")
+        except FileNotFoundError:
+            self.logger.warning("[MeeTrans._has_video_stream] ffprobeが見つからないため、拡張子で動画ファイルかを判定します。")
+            return os.path.splitext(path)[1].lower() in self.VIDEO_EXTENSIONS
+        return any(line.strip().rstrip(",").split(",")[-1] != "1" for line in output.splitlines())
+
+    def _has_audio_stream(self, path):
+        """入力ファイルに音声ストリームが含まれるかを確認するメソッド。
+
+        Args:
+            path (str): 入力ファイルのパス。
+
+        Returns:
+            bool: 音声ストリームがあればTrue。ffprobeが見つからない場合は確認できないためTrue。
+        """
+        try:
+            return self._ffprobe(path, "a", "stream=codec_type") != ""
+        except FileNotFoundError:
+            return True
+
+    def _is_pcm16_mono_16k(self, path):
+        """入力ファイルの音声が既に16kHzモノラルの16bit PCMかを確認するメソッド。
 
-        入力されたファイルが動画の場合、ffmpegを使用して音声ファイル（mp3形式）に変換します。
+        Args:
+            path (str): 入力ファイルのパス。
+
+        Returns:
+            bool: 16kHzモノラルのpcm_s16leであればTrue。ffprobeが見つからない場合はFalse。
+        """
+        try:
+            return self._ffprobe(path, "a:0", "stream=codec_name,sample_rate,channels") == "pcm_s16le,16000,1"
+        except FileNotFoundError:
+            return False
+
+    def _open_audio_stream(self, path):
+        """動画ファイルの音声をPCMとして標準出力に書き出すffmpegプロセスを起動するメソッド。
+
+        ffmpegで16kHzモノラルのfloat32 PCMにデコードします。音声が既に16kHzモノラルの
+        16bit PCMの場合は再エンコードせずにそのまま取り出します。音声全体をメモリに
+        読み込まず、`_iter_audio_windows()`で少しずつ読み出して使います。
+
+        Args:
+            path (str): 入力する動画ファイルのパス。
 
         Returns:
-            str: 変換された音声ファイル（mp3）のパス。
+            tuple: (ffmpegのプロセス, PCMのサンプル型, ffmpegのエラー出力を書き込む一時ファイル) のタプル。
         """
-        audio_file = f"{os.path.splitext(self.input_file)[0]}.mp3"
-        self.logger.info(f"[MeeTrans.convert_video_to_audio] 動画ファイル '{self.input_file}' をmp3に変換中...")
+        import numpy as np
+        self.logger.info(f"[MeeTrans._open_audio_stream] 動画ファイル '{path}' から音声を読み込みます。")
+
+        if self._is_pcm16_mono_16k(path):
+            command = ["ffmpeg", "-nostdin", "-i", path, "-map", "0:a:0",
+                       "-f", "s16le", "-c:a", "copy", "-loglevel", "error", "-"]
+            dtype = np.int16
+        else:
+            command = ["ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+                       "-f", "f32le", "-ac", "1", "-acodec", "pcm_f32le", "-ar", "16000", "-loglevel", "error", "-"]
+            dtype = np.float32
+        # エラー出力はパイプが詰まらないよう一時ファイルに書き出し、失敗時のメッセージに使う
+        stderr = tempfile.TemporaryFile()
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, bufsize=1 << 20)
+        return proc, dtype, stderr
+
+    def _iter_audio_windows(self, proc, dtype, stderr, window_seconds):
+        """ffmpegの出力を一定時間ごとに区切り、float32の音声波形として返すジェネレータ。
+
+        Args:
+            proc (subprocess.Popen): `_open_audio_stream()`で起動したffmpegのプロセス。
+            dtype (numpy.dtype): PCMのサンプル型（numpy.float32またはnumpy.int16）。
+            stderr (file): ffmpegのエラー出力を書き込んでいる一時ファイル。
+            window_seconds (int): 一度に読み出す音声の長さ（秒）。
+
+        Yields:
+            tuple: (区間の開始秒, 16kHzモノラルの音声波形) のタプル。
+
+        Raises:
+            RuntimeError: ffmpegが異常終了した場合（ffmpegのエラーメッセージを含む）。
+        """
+        import numpy as np
+        window_bytes = 16000 * window_seconds * np.dtype(dtype).itemsize
+        offset = 0.0
+        try:
+            while chunk := proc.stdout.read(window_bytes):
+                audio = np.frombuffer(chunk, dtype=dtype)
+                if dtype == np.int16:
+                    audio = audio.astype(np.float32) / 32768.0
+                yield offset, audio
+                offset += len(audio) / 16000
+        except BaseException:
+            # 途中で処理が中断された場合は、ffmpegを終了させてから例外を伝える
+            proc.kill()
+            raise
+        finally:
+            proc.stdout.close()
+            proc.wait()
+            stderr.seek(0)
+            message = stderr.read().decode("utf-8", errors="replace").strip()
+            stderr.close()
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpegで入力ファイル '{self.input_file}' の音声を読み込めませんでした"
+                               f"（終了コード {proc.returncode}）: {message}")
+
+    @staticmethod
+    def _stream_vad_options():
+        """区間ごとの文字起こしで使うSilero VADの設定を返す静的メソッド。
+
+        `BatchedInferencePipeline`が`vad_filter=True`のときに使うデフォルトの設定と同じです。
+
+        Returns:
+            VadOptions: VADの設定。
+        """
+        from faster_whisper.vad import VadOptions
+        return VadOptions(max_speech_duration_s=30, min_silence_duration_ms=160)
+
+    def _find_window_cut(self, audio, final=False):
+        """区間の音声を発話の途中で切らない位置と、それより前の発話区間を求めるメソッド。
+
+        Silero VADで発話区間を検出し、最後の発話が区間の末尾まで続いている場合はその発話の開始位置を、
+        末尾より前で終わっている場合はその終了位置を切る位置とします。この位置以降の音声は次の区間に
+        繰り越します。ここで検出した発話区間をそのまま`_decode()`に渡し、VADを二重に行わないようにします。
+
+        Args:
+            audio (numpy.ndarray): 16kHzモノラルの音声波形。
+            final (bool, optional): 最後の区間かどうか。Trueの場合は繰り越さずに末尾で切ります。
+
+        Returns:
+            tuple: (区間を切るサンプル位置, 切る位置より前の発話区間のリスト) のタプル。
+                発話区間はサンプル単位の'start'と'end'を持つ辞書です。
+        """
+        from faster_whisper.vad import get_speech_timestamps
+        speech = get_speech_timestamps(audio, self._stream_vad_options())
+        if final or not speech:
+            return len(audio), speech
+        last = speech[-1]
+        if last["end"] < len(audio) - 16000 * self.WINDOW_EDGE_SECONDS:
+            return last["end"], speech
+        if last["start"] == 0:
+            return len(audio), speech
+        return last["start"], speech[:-1]
+
+    def _transcribe_stream(self, proc, dtype, stderr, initial_prompt, kw):
+        """ffmpegの出力を区間ごとに文字起こしし、セグメントを順に返すジェネレータ。
+
+        区間の長さはバッチサイズ分の30秒チャンク（`batch_size * 30`秒）で、長時間の会議でも
+        メモリ使用量が一定に保たれます。区間の境界で発話が途切れないよう、`_find_window_cut()`で
+        求めた位置以降の音声は次の区間の先頭に繰り越します。VADは`_find_window_cut()`で一度だけ行い、
+        検出した発話区間を`_decode()`に渡します。各区間のプロンプトには、指定された用語集に続けて
+        直前の区間の末尾`PROMPT_TAIL_CHARS`文字を渡し、区間をまたいだ文脈を引き継ぎます。
+
+        VADは区間ごとに行うため、同じ会議の音声ファイルを直接文字起こしした場合とは
+        セグメントの区切りや文字起こし結果が一致しないことがあります。
+
+        Args:
+            proc (subprocess.Popen): `_open_audio_stream()`で起動したffmpegのプロセス。
+            dtype (numpy.dtype): PCMのサンプル型。
+            stderr (file): ffmpegのエラー出力を書き込んでいる一時ファイル。
+            initial_prompt (str): 用語集や参考文。指定がなければNone。
+            kw (dict): `_decode()`に渡すその他のオプション。
+
+        Yields:
+            Segment: 入力ファイル先頭からの時刻に補正した文字起こしセグメント。
+        """
+        import dataclasses
+        import numpy as np
+        prompt = initial_prompt
+        carry = np.zeros(0, dtype=np.float32)
+        carry_offset = 0.0
+        windows = self._iter_audio_windows(proc, dtype, stderr, 30 * self.batch_size)
+        # 最後に繰り越された音声も文字起こしするため、末尾に空の区間を加える
+        for offset, audio in itertools.chain(windows, [(None, None)]):
+            if audio is None:
+                if len(carry) == 0:
+                    break
+                buffer = carry
+                cut, speech = self._find_window_cut(buffer, final=True)
+            else:
+                buffer = np.concatenate([carry, audio]) if len(carry) else audio
+                cut, speech = self._find_window_cut(buffer)
+            start = carry_offset if len(carry) else offset
+            carry = buffer[cut:]
+            carry_offset = start + cut / 16000
+            if not speech:
+                continue
+            segments = self._decode(buffer[:cut], dict(kw, initial_prompt=prompt), speech)
+            text = ""
+            for segment in segments:
+                text += segment.text
+                yield dataclasses.replace(segment, start=segment.start + start, end=segment.end + start)
+            prompt = (initial_prompt or "") + text[-self.PROMPT_TAIL_CHARS:]
 
-        command = ["ffmpeg", "-i", self.input_file, "-q:a", "0", "-map", "a", audio_file, "-y", "-loglevel", "quiet"]
-        
-        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    def _decode(self, audio, kw, speech=None):
+        """音声を文字起こしし、セグメントのジェネレータを返すメソッド。
 
-        self.logger.info(f"[MeeTrans.convert_video_to_audio] 音声ファイル '{audio_file}' に変換完了。")
-        return audio_file
+        通常は`BatchedInferencePipeline`でまとめてデコードします。`condition_on_previous_text`が
+        指定されている場合は、直前の結果をプロンプトに使えるよう`WhisperModel`で順にデコードします。
+        発話区間が渡された場合はVADを行わず、その区間を`clip_timestamps`として渡します。
+
+        Args:
+            audio (str | numpy.ndarray): 音声ファイルのパス、または16kHzモノラルの音声波形。
+            kw (dict): `transcribe()`に渡すその他のオプション。
+            speech (list, optional): `_find_window_cut()`で検出した発話区間。デフォルトはNone。
+
+        Returns:
+            iterable: 文字起こしセグメントのジェネレータ。
+        """
+        if speech is not None:
+            kw = dict(kw, vad_filter=False)
+        if self.condition_on_previous_text:
+            if speech is not None:
+                # WhisperModelのclip_timestampsは秒単位の開始・終了を交互に並べたリスト
+                kw["clip_timestamps"] = [t / 16000 for chunk in speech for t in (chunk["start"], chunk["end"])]
+            segments, _ = self.whisper_model.transcribe(audio, condition_on_previous_text=True, **kw)
+        else:
+            if speech is not None:
+                # BatchedInferencePipelineのclip_timestampsはVADの結果をまとめたサンプル単位の区間
+                from faster_whisper.vad import merge_segments
+                kw["clip_timestamps"] = merge_segments(speech, self._stream_vad_options())
+            segments, _ = self.pipeline.transcribe(audio, batch_size=self.batch_size, **kw)
+        return segments
+
+    def _maybe_convert(self):
+        """入力ファイルを文字起こし可能な音声に変換するメソッド。
+
+        ffprobeで動画ストリームの有無を確認し、動画ファイルの場合は`_open_audio_stream()`で
+        ffmpegによる音声のデコードを開始します。音声のみのファイルは変換せず、そのままのパスを返します。
+        動画ファイルは`_transcribe_stream()`で区間ごとに、音声ファイルはfaster-whisperで全体を一度に
+        文字起こしするため、同じ会議の音声と動画では結果が異なる場合があります。
+        `__init__`からバックグラウンドのスレッドで呼び出されます。
+
+        音声ストリームがない場合は、出力ファイルを開く前にエラーにします。
+
+        Returns:
+            str | tuple: 音声ファイルのパス、または`_open_audio_stream()`の戻り値のタプル。
+
+        Raises:
+            ValueError: 入力ファイルに音声ストリームがない場合。
+        """
+        if not self._has_audio_stream(self.input_file):
+            raise ValueError(f"入力ファイル '{self.input_file}' に音声ストリームがありません。")
+        if self._has_video_stream(self.input_file):
+            return self._open_audio_stream(self.input_file)
+        return self.input_file
 
     def transcribe(self):
         """音声/動画ファイルを文字起こしするメソッド。
 
-        入力ファイルが動画の場合は、先に`convert_video_to_audio()`で音声ファイルに変換し、
-        その後Whisperモデルを使用して文字起こしを行います。結果は指定されたテキストファイルに
-        保存されます。
+        `__init__`で開始した`_maybe_convert()`の完了を待ち、Whisperモデルを使用して
+        文字起こしを行います。結果は指定されたテキストファイルに保存されます。
         """
-        # 入力ファイルの拡張子を確認し、動画ファイルの場合は音声に変換
-        ext = os.path.splitext(self.input_file)[1].lower()
-        if ext in ['.mp4', '.mkv', '.mov', '.avi']:
-            self.audio_file = self.convert_video_to_audio()
-        else:
-            self.audio_file = self.input_file
+        self.audio_file = self._convert_future.result()
+        self._vad_future.result()
 
-        self.logger.info(f"[MeeTrans.transcribe] 音声ファイル '{self.audio_file}' をモデル '{self.model}' で文字起こし中...")
+        self.logger.info(f"[MeeTrans.transcribe] 入力ファイル '{self.input_file}' をモデル '{self.model}' で文字起こしを開始します。")
 
         # プロンプトファイルが指定されている場合、内容を読み込む
         initial_prompt = None
@@ -81,47 +583,105 @@ class MeeTrans:
             with open(self.prompt_file, "r", encoding="utf-8") as f:
                 initial_prompt = f.read()
 
-        # 文字起こしを実行
-        segments, _ = self.whisper_model.transcribe(
-            self.audio_file,
-            language="ja",
-            vad_filter=True,
-            initial_prompt=initial_prompt
-        )
+        # 文字起こしのオプション。タイムスタンプを出力しない場合はタイムスタンプトークンの生成を省略する
+        kw = dict(language="ja", vad_filter=True, initial_prompt=initial_prompt, chunk_length=30,
+                  without_timestamps=not self.timestamp)
+        if self.fast:
+            kw.update(beam_size=1, best_of=1, temperature=0.0, patience=1.0)
+
+        # 文字起こしを実行（segmentsはジェネレータで、実際の推論は保存時に逐次行われる）
+        if isinstance(self.audio_file, str):
+            segments = self._decode(self.audio_file, kw)
+        else:
+            segments = self._transcribe_stream(*self.audio_file, initial_prompt, kw)
 
         self.save_transcription(segments)
 
-    def format_timestamp(self, seconds):
-        """秒数を [hh:mm:ss] 形式にフォーマットするメソッド。
+    def log_progress(self, segments):
+        """セグメントをそのまま返しつつ、`PROGRESS_INTERVAL`セグメントごとに進捗をログに出力するジェネレータ。
 
         Args:
-            seconds (float): タイムスタンプの秒数。
+            segments (iterable): Whisperモデルからの文字起こしセグメントのジェネレータ。
 
-        Returns:
-            str: [hh:mm:ss] 形式にフォーマットされたタイムスタンプ。
+        Yields:
+            Segment: 受け取ったセグメント。
+        """
+        for i, segment in enumerate(segments, 1):
+            if i % self.PROGRESS_INTERVAL == 0:
+                self.logger.info(f"[MeeTrans.log_progress] {datetime.timedelta(seconds=int(segment.end))} まで文字起こし済み...")
+            yield segment
+
+    @staticmethod
+    def format_timestamped_lines(segments):
+        """セグメントを [hh:mm:ss -> hh:mm:ss] 付きの行に整形するジェネレータ。
+
+        時・分は直前のセグメントと同じ分に収まる間は再計算せず、終了時刻も開始時刻と
+        同じ分であれば開始時刻の時・分を使い回します。1行の整形は事前に用意した
+        テンプレートの`format`一回で行います。
+
+        Args:
+            segments (iterable): Whisperモデルからの文字起こしセグメントのジェネレータ。
+
+        Yields:
+            str: 改行付きの1行分の文字列。
         """
-        seconds = int(seconds)
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        sec = int(seconds % 60)
-        return f'{hours:02}:{minutes:02}:{sec:02}'
+        template = '[{:02d}:{:02d}:{:02d} -> {:02d}:{:02d}:{:02d}] {}\n'
+        prev_minutes = -1
+        h0 = m0 = 0
+        for segment in segments:
+            s0 = int(segment.start)
+            s1 = int(segment.end)
+            minutes0 = s0 // 60
+            if minutes0 != prev_minutes:
+                h0, m0 = divmod(minutes0, 60)
+                prev_minutes = minutes0
+            minutes1 = s1 // 60
+            if minutes1 == minutes0:
+                h1, m1 = h0, m0
+            else:
+                h1, m1 = divmod(minutes1, 60)
+            yield template.format(h0, m0, s0 % 60, h1, m1, s1 % 60, segment.text)
 
     def save_transcription(self, segments):
         """文字起こし結果をファイルに保存するメソッド。
 
+        セグメントはリストに変換せず、推論されたものから順に`writelines`で書き込みます。
+        ファイルはバイナリモードで開いてUTF-8にエンコード済みの行を書き込み、書き込みバッファを
+        `WRITE_BUFFER_SIZE`まで大きくしてシステムコールの回数を抑えます。改行コードはOSによらずLFになります。
+
         Args:
-            segments (list): Whisperモデルからの文字起こしセグメントのリスト。
+            segments (iterable): Whisperモデルからの文字起こしセグメントのジェネレータ。
         """
-        with open(self.output_file, "w", encoding="utf-8") as f:
-            for segment in segments:
-                if self.timestamp:
-                    start = self.format_timestamp(segment.start)
-                    end = self.format_timestamp(segment.end)
-                    f.write(f'[{start} -> {end}] {segment.text}\n')
-                else:
-                    f.write(f'{segment.text}\n')
+        segments = self.log_progress(segments)
+        if self.timestamp:
+            lines = self.format_timestamped_lines(segments)
+        else:
+            lines = (f'{s.text}\n' for s in segments)
+        with open(self.output_file, "wb", buffering=self.WRITE_BUFFER_SIZE) as f:
+            f.writelines(line.encode("utf-8") for line in lines)
         self.logger.info(f"[MeeTrans.save_transcription] 文字起こし結果を '{self.output_file}' に保存しました。")
 
+    @staticmethod
+    def positive_int(value):
+        """コマンドライン引数を1以上の整数に変換する静的メソッド。
+
+        Args:
+            value (str): コマンドライン引数の文字列。
+
+        Returns:
+            int: 変換された整数。
+
+        Raises:
+            argparse.ArgumentTypeError: 1以上の整数でない場合。
+        """
+        try:
+            number = int(value)
+        except ValueError:
+            number = 0
+        if number < 1:
+            raise argparse.ArgumentTypeError(f"1以上の整数を指定してください: '{value}'")
+        return number
+
     @staticmethod
     def parse_arguments():
         """コマンドライン引数を解析する静的メソッド。
@@ -133,28 +693,64 @@ class MeeTrans:
         """
         today_str = datetime.datetime.now().strftime('%Y%m%d')
         default_output = f"meetrans_output_{today_str}.txt"
-        available_models = ['tiny', 'base', 'small', 'medium', 'large-v3']
+        available_models = ['tiny', 'base', 'small', 'medium', 'large-v3', 'large-v3-turbo']
+        available_devices = ['auto', 'cuda', 'cpu']
+        available_compute_types = ['float16', 'int8_float16', 'int8']
 
         parser = argparse.ArgumentParser(prog='meetrans', description='音声/動画ファイルをAIで文字起こししてテキストファイルに保存するプログラム')
-        parser.add_argument('input_file', type=str, help='入力する音声または動画ファイルのパス')
-        parser.add_argument('--output', '-o', type=str, default=default_output, 
-                            help=f'出力先のテキストファイルのパス（デフォルトは "{default_output}"）')
+        parser.add_argument('input_file', type=str, nargs='+',
+                            help='入力する音声または動画ファイルのパス（複数指定した場合は各ファイルと同じ場所に".txt"で保存）')
+        parser.add_argument('--output', '-o', type=str, default=None, 
+                            help=f'出力先のテキストファイルのパス（入力が1つの場合のみ指定可能。デフォルトは "{default_output}"）')
         parser.add_argument('--model', '-m', type=str, choices=available_models, default='large-v3',
-                            help=f"使用するAIモデルを指定（デフォルトは 'large-v3'）")
+                            help=f"使用するAIモデルを指定（デフォルトは 'large-v3'。'large-v3-turbo'はデコーダが小さく約4倍高速）")
         parser.add_argument('--prompt', '-p', type=str, help='用語集や参考文を記載したテキストファイルのパス（任意）')
         parser.add_argument('--timestamp', '-t', action='store_true', help='出力にタイムスタンプを含めるかどうか')
+        parser.add_argument('--condition-on-previous-text', action='store_true',
+                            help='直前の文字起こし結果を次の区間のプロンプトに使う（バッチ推論を使わず順にデコードするため遅くなり、'
+                                 '長い音声では繰り返しが起きやすくなる）')
+        parser.add_argument('--fast', action='store_true',
+                            help='ビームサーチを行わず貪欲法でデコードする（デコードが3〜5倍速くなる代わりに誤認識率がわずかに上がる）')
+        parser.add_argument('--batch-size', type=MeeTrans.positive_int, default=None,
+                            help='一度にまとめて推論する音声区間の数（デフォルトは演算精度に応じて4〜16。VRAMが不足する場合は小さくする）')
+        parser.add_argument('--device', type=str, choices=available_devices, default='auto',
+                            help="推論に使用するデバイスを指定（デフォルトは 'auto'。CUDAが使えない場合はCPUで実行）")
+        parser.add_argument('--compute-type', type=str, choices=available_compute_types, default=None,
+                            help="モデルの演算精度を指定（デフォルトはGPUで 'int8_float16'、CPUで 'int8'。"
+                                 "int8の動的量子化は精度をほぼ保ったままCPUでもリアルタイムに近い速度で動作する。"
+                                 "GPUのVRAMが不足する場合は自動で下げる）")
 
-        return parser.parse_args()
+        args = parser.parse_args()
+        for input_file in args.input_file:
+            if not os.path.isfile(input_file):
+                parser.error(f"入力ファイル '{input_file}' が見つかりません。")
+        if len(args.input_file) > 1:
+            if args.output is not None:
+                parser.error('入力ファイルが複数の場合、--output は指定できません（各ファイルと同じ場所に".txt"で保存されます）')
+            try:
+                MeeTrans.batch_output_files(args.input_file)
+            except ValueError as e:
+                parser.error(str(e))
+        elif args.output is None:
+            args.output = default_output
+        return args
 
 def main():
     """メイン処理を実行する関数。
 
     コマンドライン引数を解析し、MeeTransクラスのインスタンスを作成し、
-    文字起こしを実行します。
+    文字起こしを実行します。入力ファイルが複数の場合は`MeeTrans.transcribe_many()`で
+    モデルを使い回しながら順に処理します。
     """
     args = MeeTrans.parse_arguments()
-    transcriber = MeeTrans(args.input_file, args.output, args.model, args.timestamp, args.prompt)
-    transcriber.transcribe()
+    options = dict(device=args.device, compute_type=args.compute_type,
+                   condition_on_previous_text=args.condition_on_previous_text, batch_size=args.batch_size,
+                   fast=args.fast)
+    if len(args.input_file) > 1:
+        MeeTrans.transcribe_many(args.input_file, args.model, args.timestamp, args.prompt, **options)
+    else:
+        transcriber = MeeTrans(args.input_file[0], args.output, args.model, args.timestamp, args.prompt, **options)
+        transcriber.transcribe()
 
 if __name__ == '__main__':
     main()